@@ -21,7 +21,16 @@ print(
     "Type command-period or control-C to stop."
 )
 
-for changes in watch("sources"):
+
+def isGlyphsSource(change, path):
+    # Ignore temporary and backup files written while saving
+    return path.endswith(".glyphs")
+
+
+# watch() already batches changes: those arriving within its default
+# debounce period (1600 ms), or while a build is running, are delivered
+# together, so they trigger a single rebuild.
+for changes in watch("sources", watch_filter=isGlyphsSource):
     print("Rebuilding font...")
     result = subprocess.run(
         ["./build.sh"],
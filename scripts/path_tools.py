@@ -1,38 +1,11 @@
 from collections import defaultdict
-from dataclasses import dataclass, field
-from functools import reduce
+from itertools import chain
 import math
-from typing import List, Tuple, NamedTuple
+from typing import NamedTuple
 from fontTools.misc.arrayTools import calcBounds
-from fontTools.misc.transform import Transform
-from fontTools.misc.bezierTools import (
-    calcCubicParameters,
-    solveQuadratic,
-    splitCubicAtT,
-)
+from fontTools.misc.bezierTools import splitCubicAtT
 from fontTools.pens.basePen import BasePen
 
-try:
-    from functools import cached_property
-except ImportError:
-
-    class cached_property(object):
-
-        # This exists in the stdlib in Python 3.8, but not earlier
-
-        """A property that is only computed once per instance and then replaces itself
-        with an ordinary attribute. Deleting the attribute resets the property."""
-
-        def __init__(self, func):
-            self.__doc__ = getattr(func, "__doc__")
-            self.func = func
-
-        def __get__(self, obj, cls):
-            if obj is None:
-                return self
-            value = obj.__dict__[self.func.__name__] = self.func(obj)
-            return value
-
 
 class BoundingBox(NamedTuple):
     """Represents a bounding box as a tuple of (xMin, yMin, xMax, yMax)."""
@@ -43,12 +16,18 @@ class BoundingBox(NamedTuple):
     yMax: float
 
 
-@dataclass
 class Segment:
-    points: List[Tuple[float, float]]
+    __slots__ = ("points", "_controlBounds")
+
+    def __init__(self, points):
+        self.points = tuple(points)
+        self._controlBounds = None
+
+    def __repr__(self):
+        return f"Segment({self.points!r})"
 
     def reverse(self):
-        return Segment(list(reversed(self.points)))
+        return Segment(self.points[::-1])
 
     def translate(self, dx, dy):
         return Segment([(x + dx, y + dy) for x, y in self.points])
@@ -61,31 +40,52 @@ class Segment:
             (x1, y1), (x2, y2) = self.points
             x = x1 + t * (x2 - x1)
             y = y1 + t * (y2 - y1)
-            return Segment([(x1, y1), (x, y)]), Segment([(x, y), (x2, y2)])
+            return Segment(((x1, y1), (x, y))), Segment(((x, y), (x2, y2)))
         else:
             assert len(self.points) == 4
             points1, points2 = splitCubicAtT(*self.points, t)
             return Segment(points1), Segment(points2)
 
-    @cached_property
+    @property
     def controlBounds(self):
-        return BoundingBox(*calcBounds(self.points))
+        if self._controlBounds is None:
+            # Same as calcBounds(), but faster for two or four points
+            if len(self.points) == 2:
+                (x1, y1), (x2, y2) = self.points
+                self._controlBounds = BoundingBox(
+                    min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+                )
+            else:
+                (x1, y1), (x2, y2), (x3, y3), (x4, y4) = self.points
+                self._controlBounds = BoundingBox(
+                    min(x1, x2, x3, x4),
+                    min(y1, y2, y3, y4),
+                    max(x1, x2, x3, x4),
+                    max(y1, y2, y3, y4),
+                )
+        return self._controlBounds
 
 
-@dataclass
 class Contour:
-    segments: List[Segment] = field(default_factory=list)
-    closed: bool = False
+    __slots__ = ("segments", "closed", "_controlBounds")
+
+    def __init__(self, segments=None, closed=False):
+        self.segments = [] if segments is None else segments
+        self.closed = closed
+        self._controlBounds = None
+
+    def __repr__(self):
+        return f"Contour({self.segments!r}, {self.closed!r})"
 
     def draw(self, pen):
         pen.moveTo(self.segments[0].points[0])
         for segment in self.segments:
-            points = segment.points[1:]
-            if len(points) == 1:
-                pen.lineTo(points[0])
+            points = segment.points
+            if len(points) == 2:
+                pen.lineTo(points[1])
             else:
-                assert len(points) == 3
-                pen.curveTo(*points)
+                assert len(points) == 4
+                pen.curveTo(points[1], points[2], points[3])
         if self.closed:
             pen.closePath()
         else:
@@ -96,18 +96,41 @@ class Contour:
 
     def closePath(self):
         firstPoint = self.segments[0].points[0]
-        lastPoint = self.segments[-1].points[-1]
-        if firstPoint != lastPoint:
-            self.append(Segment([lastPoint, firstPoint]))
+        lastSegment = self.segments[-1]
+        lastPoint = lastSegment.points[-1]
+        if lastPoint != firstPoint:
+            if _pointsEqual(firstPoint, lastPoint):
+                # Snap the end point rather than add a near-zero-length line,
+                # so the contour ends exactly where it starts
+                self.segments[-1] = Segment(lastSegment.points[:-1] + (firstPoint,))
+            else:
+                self.append(Segment((lastPoint, firstPoint)))
         self.closed = True
 
     def translate(self, dx, dy):
         return Contour(
-            [segment.translate(dx, dy) for segment in self.segments], self.closed
+            [
+                Segment([(x + dx, y + dy) for x, y in segment.points])
+                for segment in self.segments
+            ],
+            self.closed,
         )
 
     def transform(self, t):
-        return Contour([segment.transform(t) for segment in self.segments], self.closed)
+        # Same as Transform.transformPoints(), but for all segments at once
+        xx, xy, yx, yy, dx, dy = t
+        return Contour(
+            [
+                Segment(
+                    [
+                        (xx * x + yx * y + dx, xy * x + yy * y + dy)
+                        for x, y in segment.points
+                    ]
+                )
+                for segment in self.segments
+            ],
+            self.closed,
+        )
 
     def reverse(self):
         return Contour([seg.reverse() for seg in reversed(self.segments)], self.closed)
@@ -116,75 +139,86 @@ class Contour:
         assert self.closed
         assert self.segments[0].points[0] == self.segments[-1].points[-1]
         angleX, angleY = math.cos(angle), math.sin(angle)
+        rotation = angleX, -angleY  # rotate by -angle
         sides = [[], []]
         previousSide = None
+        run = None  # the list of segments we are currently appending to
         for segment in self.segments:
-            dx1 = segment.points[1][0] - segment.points[0][0]
-            dy1 = segment.points[1][1] - segment.points[0][1]
-            side1 = whichSide((angleX, angleY), (dx1, dy1)) >= 0
-            if len(segment.points) == 4:
-                dx2 = segment.points[3][0] - segment.points[2][0]
-                dy2 = segment.points[3][1] - segment.points[2][1]
-                side2 = whichSide((angleX, angleY), (dx2, dy2)) >= 0
+            points = segment.points
+            (x1, y1), (x2, y2) = points[0], points[1]
+            # Which side of the angle the start tangent is on: the sign of the
+            # cross product of (angleX, angleY) and the tangent
+            side1 = angleX * (y2 - y1) - angleY * (x2 - x1) >= 0
+            if previousSide != side1:
+                run = []
+                sides[side1].append(run)
+            if len(points) == 4:
+                (x3, y3), (x4, y4) = points[2], points[3]
+                side2 = angleX * (y4 - y3) - angleY * (x4 - x3) >= 0
                 if side1 == side2:
-                    if previousSide != side1:
-                        sides[side1].append([])
-                    sides[side1][-1].append(segment)
+                    run.append(segment)
                 else:
-                    curve1, curve2 = splitCurveAtAngle(segment.points, angle, True)
-                    if previousSide != side1:
-                        sides[side1].append([])
-                    sides[side1][-1].append(Segment(curve1))
+                    curve1, curve2 = splitCurveAtAngle(points, angle, True, rotation)
                     if curve2 is not None:
-                        sides[side2].append([])
-                        sides[side2][-1].append(Segment(curve2))
+                        run.append(Segment(curve1))
+                        run = [Segment(curve2)]
+                        sides[side2].append(run)
                     else:
+                        # Not split after all: curve1 is the original curve
+                        run.append(segment)
                         side2 = side1  # why
                 previousSide = side2
             else:
-                if previousSide != side1:
-                    sides[side1].append([])
-                sides[side1][-1].append(segment)
+                run.append(segment)
                 previousSide = side1
         leftSides, rightSides = sides
         for sides in [leftSides, rightSides]:
             if len(sides) > 1 and _pointsEqual(
                 sides[-1][-1].points[-1], sides[0][0].points[0]
             ):
-                sides[0] = sides[-1] + sides[0]
-                del sides[-1]
-        return Path(map(Contour, leftSides)), Path(map(Contour, rightSides))
+                lastRun = sides.pop()
+                lastRun.extend(sides[0])
+                sides[0] = lastRun
+        return (
+            Path([Contour(segments) for segments in leftSides]),
+            Path([Contour(segments) for segments in rightSides]),
+        )
 
     def splitAtSharpCorners(self):
         assert not self.closed
-        lastDelta = None
+        lastDx = lastDy = None
         contours = [[]]
         for segment in self.segments:
-            d = (
-                segment.points[1][0] - segment.points[0][0],
-                segment.points[1][1] - segment.points[0][1],
-            )
-            if (
-                lastDelta is not None
-                and abs(whichSide(normalize(*lastDelta), normalize(*d))) > 0.1
-            ):
-                contours.append([])
+            points = segment.points
+            (x1, y1), (x2, y2) = points[0], points[1]
+            dx = x2 - x1
+            dy = y2 - y1
+            if lastDx is not None:
+                # Equivalent to testing whether the cross product of the two
+                # normalized tangents exceeds 0.1 in absolute value, but
+                # without the square roots
+                cross = lastDx * dy - lastDy * dx
+                lastLengthSquared = lastDx * lastDx + lastDy * lastDy
+                lengthSquared = dx * dx + dy * dy
+                if cross * cross > 0.01 * lastLengthSquared * lengthSquared:
+                    contours.append([])
             contours[-1].append(segment)
-            if len(segment.points) == 4:
-                d = (
-                    segment.points[3][0] - segment.points[2][0],
-                    segment.points[3][1] - segment.points[2][1],
-                )
-            lastDelta = d
+            if len(points) == 4:
+                (x3, y3), (x4, y4) = points[2], points[3]
+                dx = x4 - x3
+                dy = y4 - y3
+            lastDx, lastDy = dx, dy
 
         return Path([Contour(segments) for segments in contours])
 
-    @cached_property
+    @property
     def controlBounds(self):
-        points = list(pt for seg in self.segments for pt in seg.points)
-        if points:
-            return BoundingBox(*calcBounds(points))
-        return None  # empty path
+        if self._controlBounds is None:
+            points = list(chain.from_iterable([seg.points for seg in self.segments]))
+            if not points:
+                return None  # empty path
+            self._controlBounds = BoundingBox(*calcBounds(points))
+        return self._controlBounds
 
 
 def _pointsEqual(pt1, pt2):
@@ -195,9 +229,15 @@ def _pointsEqual(pt1, pt2):
     )
 
 
-@dataclass
 class Path:
-    contours: List[Contour] = field(default_factory=list)
+    __slots__ = ("contours", "_controlBounds")
+
+    def __init__(self, contours=None):
+        self.contours = [] if contours is None else contours
+        self._controlBounds = None
+
+    def __repr__(self):
+        return f"Path({self.contours!r})"
 
     def draw(self, pen):
         for contour in self.contours:
@@ -236,90 +276,174 @@ class Path:
             path.appendPath(contour.splitAtSharpCorners())
         return path
 
-    @cached_property
+    @property
     def controlBounds(self):
-        points = list(
-            pt for cont in self.contours for seg in cont.segments for pt in seg.points
-        )
-        if points:
-            return BoundingBox(*calcBounds(points))
-        return None  # empty path
+        if self._controlBounds is None:
+            points = list(
+                chain.from_iterable(
+                    [seg.points for cont in self.contours for seg in cont.segments]
+                )
+            )
+            if not points:
+                return None  # empty path
+            self._controlBounds = BoundingBox(*calcBounds(points))
+        return self._controlBounds
 
 
 def extrudePath(path, angle, depth, reverse=False):
     dx = depth * math.cos(angle)
     dy = depth * math.sin(angle)
 
-    pathOffset = path.translate(dx, dy)
     extruded = Path()
-    for cont1, cont2 in zip(path.contours, pathOffset.contours):
+    for cont1 in path.contours:
         segments1 = cont1.segments
-        segments2 = cont2.reverse().segments
-        seg12 = Segment([segments1[-1].points[-1], segments2[0].points[0]])
-        seg21 = Segment([segments2[-1].points[-1], segments1[0].points[0]])
-        contour = Contour(segments1 + [seg12] + segments2 + [seg21], True)
-        extruded.append(contour.reverse() if reverse else contour)
+        segments2 = cont1.translate(dx, dy).segments
+        start1 = segments1[0].points[0]
+        end1 = segments1[-1].points[-1]
+        start2 = segments2[0].points[0]
+        end2 = segments2[-1].points[-1]
+        if reverse:
+            # The reverse of the contour below, built directly
+            segments = (
+                [Segment((start1, start2))]
+                + segments2
+                + [Segment((end2, end1))]
+                + [segment.reverse() for segment in reversed(segments1)]
+            )
+        else:
+            segments = (
+                segments1
+                + [Segment((end1, end2))]
+                + [segment.reverse() for segment in reversed(segments2)]
+                + [Segment((start2, start1))]
+            )
+        extruded.append(Contour(segments, True))
     return extruded
 
 
-def splitCurveAtAngle(curve, angle, bothDirections=False):
-    t = Transform().rotate(-angle)
-    pt1, pt2, pt3, pt4 = t.transformPoints(curve)
-    (ax, ay), (bx, by), (cx, cy), (dx, dy) = calcCubicParameters(pt1, pt2, pt3, pt4)
+def splitCurveAtAngle(curve, angle, bothDirections=False, rotation=None):
+    # Rotate the control points by -angle and compute the cubic parameters
+    # in one go; this is equivalent to Transform().rotate(-angle) followed by
+    # calcCubicParameters(), but without the intermediate objects.
+    # Callers splitting many curves at the same angle can pass the
+    # precomputed (cos(-angle), sin(-angle)) pair as `rotation`.
+    if rotation is None:
+        rotation = math.cos(-angle), math.sin(-angle)
+    cosA, sinA = rotation
+    (x1, y1), (x2, y2), (x3, y3), (x4, y4) = curve
+    rx1 = cosA * x1 - sinA * y1
+    ry1 = sinA * x1 + cosA * y1
+    rx2 = cosA * x2 - sinA * y2
+    ry2 = sinA * x2 + cosA * y2
+    rx3 = cosA * x3 - sinA * y3
+    ry3 = sinA * x3 + cosA * y3
+    rx4 = cosA * x4 - sinA * y4
+    ry4 = sinA * x4 + cosA * y4
+    cx = (rx2 - rx1) * 3.0
+    cy = (ry2 - ry1) * 3.0
+    bx = (rx3 - rx2) * 3.0 - cx
+    by = (ry3 - ry2) * 3.0 - cy
+    ax = rx4 - rx1 - cx - bx
+    ay = ry4 - ry1 - cy - by
     # calc first derivative
     ax3 = ax * 3.0
     bx2 = bx * 2.0
     ay3 = ay * 3.0
     by2 = by * 2.0
 
-    yRoots = [t for t in solveQuadratic(ay3, by2, cy) if 0 <= t < 1]
+    yRoots = _solveQuadraticInUnitInterval(ay3, by2, cy)
 
     if not yRoots:
         return curve, None
     elif len(yRoots) == 1:
         t = yRoots[0]
         if bothDirections or (ax3 * t**2 + bx2 * t + cx) > 0:
-            return splitCubicAtT(*curve, t)
+            return _splitCubicAtT(*curve, t)
         else:
             return curve, None
     else:
         assert False, "curve too complex"  # a.k.a. I'm too lazy to implement
 
 
-def whichSide(v1, v2):
-    x1, y1 = v1
-    x2, y2 = v2
-    return x1 * y2 - y1 * x2
+def _splitCubicAtT(pt1, pt2, pt3, pt4, t):
+    """Split a cubic curve at a single t value, using de Casteljau's
+    algorithm. Returns two 4-tuples of points."""
+    (x1, y1), (x2, y2), (x3, y3), (x4, y4) = pt1, pt2, pt3, pt4
+    x12 = x1 + t * (x2 - x1)
+    y12 = y1 + t * (y2 - y1)
+    x23 = x2 + t * (x3 - x2)
+    y23 = y2 + t * (y3 - y2)
+    x34 = x3 + t * (x4 - x3)
+    y34 = y3 + t * (y4 - y3)
+    x123 = x12 + t * (x23 - x12)
+    y123 = y12 + t * (y23 - y12)
+    x234 = x23 + t * (x34 - x23)
+    y234 = y23 + t * (y34 - y23)
+    x = x123 + t * (x234 - x123)
+    y = y123 + t * (y234 - y123)
+    return (
+        (pt1, (x12, y12), (x123, y123), (x, y)),
+        ((x, y), (x234, y234), (x34, y34), pt4),
+    )
 
 
-def normalize(x, y):
-    d = math.hypot(x, y)
-    if abs(d) > 0.00000000001:
-        return x / d, y / d
+def _solveQuadraticInUnitInterval(a, b, c):
+    """Return the roots t of a*t*t + b*t + c = 0 for which 0 <= t < 1."""
+    if abs(a) < 1e-10:
+        if abs(b) < 1e-10:
+            return []
+        roots = (-c / b,)
     else:
-        return 0, 0
+        discriminant = b * b - 4.0 * a * c
+        if discriminant < 0.0:
+            return []
+        # Numerically stable form: avoid subtracting nearly equal values
+        q = -0.5 * (b + math.copysign(math.sqrt(discriminant), b))
+        if not q:
+            roots = (0.0,)  # b == c == 0
+        elif not discriminant:
+            roots = (q / a,)
+        else:
+            roots = (q / a, c / q)
+    return [t for t in roots if 0 <= t < 1]
 
 
 class PathBuilderPen(BasePen):
     def __init__(self, glyphSet):
         super().__init__(glyphSet)
         self.path = Path()
+        self.contour = None
         self.currentPoint = None
 
     def _moveTo(self, pt):
         self.currentPoint = pt
-        self.path.append(Contour())
+        self.contour = Contour()
+        self.path.append(self.contour)
 
     def _lineTo(self, pt):
-        self.path.appendSegment(Segment([self.currentPoint, pt]))
+        if _pointsEqual(self.currentPoint, pt):
+            return  # skip zero-length lines
+        self.contour.segments.append(Segment((self.currentPoint, pt)))
         self.currentPoint = pt
 
     def _curveToOne(self, pt2, pt3, pt4):
-        self.path.appendSegment(Segment([self.currentPoint, pt2, pt3, pt4]))
+        self.contour.segments.append(Segment((self.currentPoint, pt2, pt3, pt4)))
         self.currentPoint = pt4
 
     def _closePath(self):
-        self.path.closePath()
+        if self.contour.segments:
+            self.contour.closePath()
+        else:
+            self._dropEmptyContour()
+
+    def _endPath(self):
+        if not self.contour.segments:
+            self._dropEmptyContour()
+
+    def _dropEmptyContour(self):
+        # The contour consisted of zero-length lines only
+        self.path.contours.pop()
+        self.contour = None
 
 
 def sortContours(contours, transform):
@@ -327,10 +451,22 @@ def sortContours(contours, transform):
         return contours
     contoursTransformed = [cont.transform(transform) for cont in contours]
     indices = set(range(len(contours)))
+    bounds = [cont.controlBounds for cont in contoursTransformed]
     comparisons = []
-    for i, cont1 in enumerate(contoursTransformed):
-        for j, cont2 in enumerate(contoursTransformed[i + 1 :], i + 1):
-            comparisons.append((i, j, horizontalOrderContour(cont1, cont2)))
+    # Contours that don't overlap vertically have no horizontal order, so
+    # sweep upwards and only compare contours whose y ranges overlap
+    active = []
+    for i in sorted(indices, key=lambda i: bounds[i].yMin):
+        yMin = bounds[i].yMin
+        active = [j for j in active if bounds[j].yMax > yMin]
+        for j in active:
+            if rectsOverlapVertically(bounds[i], bounds[j]):
+                i1, i2 = min(i, j), max(i, j)
+                ho = horizontalOrderContour(
+                    contoursTransformed[i1], contoursTransformed[i2]
+                )
+                comparisons.append((i1, i2, ho))
+        active.append(i)
     comparisons = [(i, j) if ho == -1 else (j, i) for i, j, ho in comparisons if ho]
 
     deps = defaultdict(set)
@@ -340,23 +476,33 @@ def sortContours(contours, transform):
         deps[i] = set()
     assert deps, indices
 
-    sortedIndices = sum(topologicalSort(deps), [])
+    sortedIndices = [i for group in topologicalSort(deps) for i in group]
     assert len(sortedIndices) == len(contours), sorted(indices - set(sortedIndices))
     return [contours[i] for i in (sortedIndices)]
 
 
 def topologicalSort(data):
-    # Adapted from https://code.activestate.com/recipes/577413-topological-sort/
-    extra_items_in_deps = reduce(set.union, data.values()) - set(data.keys())
-    data.update({item: set() for item in extra_items_in_deps})
-    while True:
-        ordered = set(item for item, dep in data.items() if not dep)
-        if not ordered:
-            break
-        yield sorted(ordered)
-        data = {
-            item: (dep - ordered) for item, dep in data.items() if item not in ordered
-        }
+    # Kahn's algorithm. Yields groups of items, each group sorted, where all
+    # dependencies of the items in a group are in earlier groups.
+    dependents = defaultdict(list)
+    numDeps = {}
+    for item, deps in data.items():
+        numDeps[item] = len(deps)
+        for dep in deps:
+            dependents[dep].append(item)
+    for item in list(dependents):
+        numDeps.setdefault(item, 0)
+    ordered = [item for item, count in numDeps.items() if not count]
+    while ordered:
+        ordered.sort()
+        yield ordered
+        nextOrdered = []
+        for item in ordered:
+            for dependent in dependents[item]:
+                numDeps[dependent] -= 1
+                if not numDeps[dependent]:
+                    nextOrdered.append(dependent)
+        ordered = nextOrdered
 
 
 def horizontalOrderContour(contour1, contour2):
@@ -403,10 +549,12 @@ def horizontalOrderSegment(segment1, segment2, maxRecursionLevel=4):
 
 
 def horizontalOrderRect(rect1, rect2):
-    if rectsOverlapVertically(rect1, rect2):
-        if rect1.xMax <= rect2.xMin:
+    xMin1, yMin1, xMax1, yMax1 = rect1
+    xMin2, yMin2, xMax2, yMax2 = rect2
+    if (yMin1 if yMin1 > yMin2 else yMin2) < (yMax1 if yMax1 < yMax2 else yMax2):
+        if xMax1 <= xMin2:
             return -1
-        elif rect1.xMin >= rect2.xMax:
+        elif xMin1 >= xMax2:
             return 1
     return 0
 
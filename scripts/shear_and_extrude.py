@@ -1,19 +1,27 @@
 import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from copy import deepcopy
+import functools
 import itertools
 import math
 import os
 import pathlib
+import pickle
 from fontTools.designspaceLib import AxisLabelDescriptor, DesignSpaceDocument
 from fontTools.misc.transform import Transform
 from fontTools.misc.bezierTools import cubicPointAtT
-from fontTools.pens.recordingPen import RecordingPen, RecordingPointPen
+from fontTools.pens.pointPen import PointToSegmentPen
+from fontTools.pens.recordingPen import (
+    RecordingPen,
+    RecordingPointPen,
+    replayRecording,
+)
 from fontTools.pens.transformPen import TransformPointPen
 from fontTools.ttLib.tables import otTables as ot
-from pathops.operations import union
+import pathops
 from ufo2ft.constants import COLOR_LAYERS_KEY, COLOR_PALETTES_KEY
 import ufoLib2
-from path_tools import PathBuilderPen, Contour, extrudePath, sortContours
+from path_tools import PathBuilderPen, Contour, Segment, extrudePath, sortContours
 
 
 RANDOM_FALLBACK_GRADIENTS = False
@@ -38,9 +46,7 @@ def parseColorTable(colorTable):
 
 def colorFromHex(hexString):
     assert len(hexString) in [6, 8]
-    channels = []
-    for i in range(0, len(hexString), 2):
-        channels.append(int(hexString[i : i + 2], 16) / 255)
+    channels = [channel / 255 for channel in bytes.fromhex(hexString)]
     if len(channels) == 3:
         channels.append(1)
     return channels
@@ -162,34 +168,50 @@ class DecomposingRecordingPointPen(RecordingPointPen):
         glyph.drawPoints(tPen)
 
 
-def decomposeComponents(glyph, font):
-    recPen = DecomposingRecordingPointPen(font)
+def decomposeComponents(glyph, glyphSet):
+    """Return the glyph's outline with all components decomposed, as a
+    RecordingPointPen value."""
+    recPen = DecomposingRecordingPointPen(glyphSet)
     glyph.drawPoints(recPen)
-    glyph.clear()
-    recPen.replay(glyph.getPointPen())
-
-
-def removeOverlaps(glyph):
+    return recPen.value
+
+
+def removeOverlaps(outline):
+    """Return the union of the contours in the outline, which is given as a
+    RecordingPointPen value, as a RecordingPen value. This doesn't need any
+    font objects, so it can run in a worker process."""
+    # This does what pathops.operations.union() does, but it draws the
+    # recording straight into the pathops Path.
+    if not outline:
+        return []
+    path = pathops.Path()
+    pointPen = PointToSegmentPen(path.getPen())
+    for method, args, kwargs in outline:
+        getattr(pointPen, method)(*args, **kwargs)
+    path.simplify(fix_winding=True, keep_starting_points=True, clockwise=False)
     recPen = RecordingPen()
-    union(glyph.contours, recPen)
-    glyph.clear()
-    recPen.replay(glyph.getPen())
+    path.draw(recPen)
+    return recPen.value
 
 
 def transformGlyph(glyph, transformation):
-    recPen = RecordingPointPen()
-    tPen = TransformPointPen(recPen, transformation)
-    glyph.drawPoints(tPen)
-    glyph.clear()
-    recPen.replay(glyph.getPointPen())
-
-
-def splitGlyphAtAngle(glyph, angle):
-    pen = PathBuilderPen(None)
-    glyph.draw(pen)
-    left, right = pen.path.splitAtAngle(angle)
-    right.contours = [cont.reverse() for cont in right.contours]
-    # left.appendPath(right)  # Add "invisible" sides
+    # Transform the points in place rather than redrawing the glyph. Like the
+    # redraw did, drop the anchors, guidelines and image, in all layers.
+    glyph.clearAnchors()
+    glyph.clearGuidelines()
+    glyph.image.clear()
+    transformPoint = transformation.transformPoint
+    for contour in glyph.contours:
+        for point in contour:
+            point.x, point.y = transformPoint((point.x, point.y))
+    for component in glyph.components:
+        component.transformation = transformation.transform(component.transformation)
+
+
+def splitPathAtAngle(path, angle):
+    # The right sides are invisible. To add them anyway, reverse their contours
+    # and append them to the left sides.
+    left, _ = path.splitAtAngle(angle)
     left = left.splitAtSharpCorners()
     return left
 
@@ -219,18 +241,118 @@ def buildFeatures(glyphNames, featureSpec):
 
 
 def decomposeAndRemoveOverlaps(font):
+    # This gives the same result as decomposing and removing overlaps one
+    # glyph at a time, in font order: components refer to the overlap-free
+    # outline of base glyphs that come earlier in the font, and to the
+    # original outline of those that come later. The overlap removal is done
+    # in rounds, and all glyphs in a round are processed in parallel.
+    glyphIndices = {glyphName: index for index, glyphName in enumerate(font.keys())}
+    processedGlyphs = {}
+    pending = list(font.keys())
+    while pending:
+        ready = [
+            glyphName
+            for glyphName in pending
+            if all(
+                baseGlyphName in processedGlyphs
+                for baseGlyphName in getEarlierBaseGlyphs(font, glyphName, glyphIndices)
+            )
+        ]
+        outlines = [
+            decomposeComponents(
+                font[glyphName],
+                GlyphSetAsOf(font, processedGlyphs, glyphIndices, glyphName),
+            )
+            for glyphName in ready
+        ]
+        for glyphName, outline in zip(ready, parallelMap(removeOverlaps, outlines)):
+            glyph = ufoLib2.objects.Glyph()
+            replayRecording(outline, glyph.getPen())
+            processedGlyphs[glyphName] = glyph
+        pending = [
+            glyphName for glyphName in pending if glyphName not in processedGlyphs
+        ]
+
     for glyph in font:
-        decomposeComponents(glyph, font)
-        removeOverlaps(glyph)
+        glyph.clear()
+        glyph.contours.extend(processedGlyphs[glyph.name].contours)
 
 
-def shearGlyph(glyph, shearAngle):
+def getEarlierBaseGlyphs(font, glyphName, glyphIndices, baseGlyphName=None):
+    """Yield the names of the glyphs that come before glyphName in the font
+    and that are used as components by glyphName, directly or via base glyphs
+    that come later in the font."""
+    for component in font[baseGlyphName or glyphName].components:
+        if glyphIndices[component.baseGlyph] < glyphIndices[glyphName]:
+            yield component.baseGlyph
+        else:
+            yield from getEarlierBaseGlyphs(
+                font, glyphName, glyphIndices, component.baseGlyph
+            )
+
+
+class GlyphSetAsOf:
+    """The glyph set as seen when processing glyphName: overlap-free glyphs
+    for the glyphs before it in the font, original glyphs for the others."""
+
+    def __init__(self, font, processedGlyphs, glyphIndices, glyphName):
+        self.font = font
+        self.processedGlyphs = processedGlyphs
+        self.glyphIndices = glyphIndices
+        self.glyphIndex = glyphIndices[glyphName]
+
+    def __getitem__(self, glyphName):
+        if self.glyphIndices[glyphName] < self.glyphIndex:
+            return self.processedGlyphs[glyphName]
+        return self.font[glyphName]
+
+
+def copyFont(font, sharedGlyphs=(), clearedGlyphs=()):
+    """Return a deep copy of the font, except for the glyph objects in
+    sharedGlyphs: those are shared with the original font, so they must be
+    treated as read-only by both. The glyphs in clearedGlyphs are copied as
+    if glyph.clear() was called on the copies."""
+    memo = {id(glyph): glyph for glyph in sharedGlyphs}
+    clearedGlyphIds = {id(glyph) for glyph in clearedGlyphs}
+    # Copying the glyphs via pickle is a lot faster than deepcopy. The font
+    # itself can't be pickled if it was opened from disk, as it holds on to
+    # its UFO reader; the deepcopy below doesn't copy the reader.
+    glyphs = [
+        glyph for layer in font.layers for glyph in layer if id(glyph) not in memo
+    ]
+    glyphsToCopy = [
+        makeClearedGlyph(glyph) if id(glyph) in clearedGlyphIds else glyph
+        for glyph in glyphs
+    ]
+    glyphCopies = pickle.loads(pickle.dumps(glyphsToCopy, pickle.HIGHEST_PROTOCOL))
+    memo.update(zip(map(id, glyphs), glyphCopies))
+    return deepcopy(font, memo)
+
+
+def makeClearedGlyph(glyph):
+    return ufoLib2.objects.Glyph(
+        glyph.name,
+        width=glyph.width,
+        height=glyph.height,
+        unicodes=glyph.unicodes,
+        lib=glyph.lib,
+        note=glyph.note,
+    )
+
+
+@functools.lru_cache
+def makeShearTransform(shearAngle):
     pivotX = 100  # glyph.width / 2
     t = Transform()
     t = t.translate(pivotX, 0)
     t = t.skew(0, shearAngle)
     t = t.scale(math.cos(shearAngle), 1)
     t = t.translate(-pivotX, 0)
+    return t
+
+
+def shearGlyph(glyph, shearAngle):
+    t = makeShearTransform(shearAngle)
     transformGlyph(glyph, t.translate(50, -75))
     lsb, _ = t.transformPoint((0, 0))
     rsb, _ = t.transformPoint((glyph.width, 0))
@@ -238,27 +360,66 @@ def shearGlyph(glyph, shearAngle):
     glyph.width = rsb - lsb
 
 
-def extrudeGlyphs(font, glyphNames, extrudeAngle, depth):
-    rotateT = Transform().rotate(-extrudeAngle)
+def makeFrontGlyphs(font, glyphNames):
+    frontGlyphs = []
+    for glyphName in glyphNames:
+        frontGlyph = font[glyphName].copy()
+        frontGlyph.unicode = None
+        font[glyphName + frontSuffix] = frontGlyph
+        frontGlyphs.append(frontGlyph)
+    return frontGlyphs
+
+
+def splitGlyphs(font, glyphNames, extrudeAngle):
+    """Split and sort the outlines of the glyphs, and find the gradient
+    contours for the side parts. None of this depends on the extrusion depth,
+    so it only needs to be done once for all depth variants. Returns a list
+    of (splitPath, gradientIndices, gradientContourPoints) tuples."""
+    gradientLayers = [font.layers["top"], font.layers["side"]]
+    glyphPaths = []
+    glyphGradientContourPoints = []
+    for glyphName in glyphNames:
+        pen = PathBuilderPen(None)
+        font[glyphName].draw(pen)
+        glyphPaths.append(pen.path)
+        glyphGradientContourPoints.append(
+            getGradientContourPoints(gradientLayers, glyphName)
+        )
+
+    results = parallelMap(
+        splitOutline,
+        glyphPaths,
+        glyphGradientContourPoints,
+        itertools.repeat(extrudeAngle),
+    )
+    return [
+        (splitPath, gradientIndices, gradientContourPoints)
+        for (splitPath, gradientIndices), gradientContourPoints in zip(
+            results, glyphGradientContourPoints
+        )
+    ]
+
+
+def extrudeGlyphs(font, glyphNames, splitGlyphData, extrudeAngle, depth):
+    # Expects the front glyphs to have been added with makeFrontGlyphs(), and
+    # splitGlyphData to be the result of splitGlyphs()
     extrudeSlope = math.tan(extrudeAngle)
     highlightLayer = font.layers["highlightColor"]
-    gradientLayers = [font.layers["top"], font.layers["side"]]
     colorGlyphs = {}
 
-    for glyphName in glyphNames:
+    for glyphName, (splitPath, gradientIndices, gradientContourPoints) in zip(
+        glyphNames, splitGlyphData
+    ):
+        extrudedPath = extrudePath(splitPath, extrudeAngle, -depth, reverse=True)
         frontLayerGlyphName = glyphName + frontSuffix
         sideLayerGlyphName = glyphName + sideSuffix
         highlightLayerGlyphName = glyphName + highlightSuffix
 
         glyph = font[glyphName]
         sideLayers = []
-        splitPath = splitGlyphAtAngle(glyph, extrudeAngle)
-
-        splitPath.contours = sortContours(splitPath.contours, rotateT)
         sideGradients = makeSideGradients(
-            splitPath, gradientLayers, glyphName, extrudeSlope
+            gradientIndices, gradientContourPoints, extrudeSlope
         )
-        extrudedPath = extrudePath(splitPath, extrudeAngle, -depth, reverse=True)
 
         sidePartGlyphNames = []
         for contourIndex, (contour, sideGradient) in enumerate(
@@ -280,8 +441,6 @@ def extrudeGlyphs(font, glyphNames, extrudeAngle, depth):
             )
         colorGlyphs[glyphName] = buildPaintLayers(layers)
 
-        font[frontLayerGlyphName] = glyph.copy()
-        font[frontLayerGlyphName].unicode = None
         glyph.clear()
         pen = glyph.getPen()
         pen.addComponent(frontLayerGlyphName, (1, 0, 0, 1, 0, 0))
@@ -291,23 +450,77 @@ def extrudeGlyphs(font, glyphNames, extrudeAngle, depth):
     return colorGlyphs
 
 
-def makeSideGradients(splitPath, gradientLayers, glyphName, extrudeSlope):
+def parallelMap(func, *iterables):
+    """Like map(), but spread the calls over worker processes if there is more
+    than one CPU. The function and its arguments must be picklable."""
+    if (os.cpu_count() or 1) == 1:
+        return list(map(func, *iterables))
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(func, *iterables, chunksize=16))
+
+
+def makeBackgroundExecutor():
+    """Return an executor for background work: worker processes if there is
+    more than one CPU, else a single thread, so that file I/O can still
+    overlap with the work in the main thread."""
+    if (os.cpu_count() or 1) == 1:
+        return ThreadPoolExecutor(max_workers=1)
+    return ProcessPoolExecutor()
+
+
+def submitSave(executor, font, path):
+    # For the process pool the font must be picklable, so it must not have a
+    # UFO reader: pass copies made with copyFont(), not fonts opened from disk.
+    if isinstance(executor, ProcessPoolExecutor):
+        # Pickle the font right away rather than in the executor's feeder
+        # thread, which would otherwise read it while we continue building
+        # the next font variant.
+        fontData = pickle.dumps(font, pickle.HIGHEST_PROTOCOL)
+        return executor.submit(savePickledFont, fontData, path)
+    return executor.submit(font.save, path, overwrite=True)
+
+
+def savePickledFont(fontData, path):
+    pickle.loads(fontData).save(path, overwrite=True)
+
+
+def splitOutline(path, gradientContourPoints, extrudeAngle):
+    """Split and sort a glyph outline, and find the gradient contour closest
+    to each side contour. This only deals with plain path objects, so it can
+    run in a worker process."""
+    rotateT = Transform().rotate(-extrudeAngle)
+    splitPath = splitPathAtAngle(path, extrudeAngle)
+    splitPath.contours = sortContours(splitPath.contours, rotateT)
+    gradientIndices = findSideGradientIndices(splitPath, gradientContourPoints)
+    return splitPath, gradientIndices
+
+
+def getGradientContourPoints(gradientLayers, glyphName):
     gradientGlyphs = [gl[glyphName] for gl in gradientLayers if glyphName in gl]
     gradientContours = [cont for g in gradientGlyphs for cont in g.contours]
-    gradientContourPoints = [
+    return [
         [((pt.x, pt.y), pt.name) for pt in cont.points if pt.name]
         for cont in gradientContours
     ]
-    gradients = []
+
+
+def findSideGradientIndices(splitPath, gradientContourPoints):
+    gradientIndices = []
     for contour in splitPath.contours:
+        lines = [makeLine(pt1, pt2) for pt1, pt2 in flattenContour(contour)]
         avgDistances = []
         for index, points in enumerate(gradientContourPoints):
             if not points:
                 continue
-            distances = [distancePointToContour(pt, contour) for pt, name in points]
+            distances = [distancePointToLines(pt, lines) for pt, name in points]
             avgDistances.append((sum(distances) / len(distances), index))
-        avgDistances.sort()
-        gradientIndex = avgDistances[0][1] if avgDistances else None
+        gradientIndices.append(min(avgDistances)[1] if avgDistances else None)
+    return gradientIndices
+
+
+def makeSideGradients(gradientIndices, gradientContourPoints, extrudeSlope):
+    gradients = []
+    for gradientIndex in gradientIndices:
         if gradientIndex is not None:
             gradient = makeSideGradient(
                 gradientContourPoints[gradientIndex], extrudeSlope
@@ -323,51 +536,45 @@ def makeSideGradients(splitPath, gradientLayers, glyphName, extrudeSlope):
     return gradients
 
 
-def distancePointToContour(pt, contour):
-    dist = math.inf
+def flattenContour(contour):
+    lines = []
     for segment in contour.segments:
-        dist = min(dist, distancePointToSegment(pt, segment))
-    return dist
+        points = segment.points
+        if len(points) == 4:
+            # Cubic curve, flatten into two line segments. Is good enough.
+            mid = cubicPointAtT(*points, 0.5)
+            lines.append((points[0], mid))
+            lines.append((mid, points[-1]))
+        else:
+            lines.append((points[0], points[-1]))
+    return lines
 
 
-def distancePointToSegment(pt, segment):
-    if len(segment.points) == 4:
-        # Cubic curve, flatten into two line segments. Is good enough.
-        mid = cubicPointAtT(*segment.points, 0.5)
-        d1 = distancePointToLine(pt, segment.points[0], mid)
-        d2 = distancePointToLine(pt, mid, segment.points[-1])
-        return min(d1, d2)
-    else:
-        return distancePointToLine(pt, segment.points[0], segment.points[-1])
+def distancePointToLines(pt, lines):
+    return min((distancePointToLine(pt, line) for line in lines), default=math.inf)
 
 
-def distancePointToLine(pt, pt1, pt2):
-    x, y = pt
+def makeLine(pt1, pt2):
+    """Return the values that distancePointToLine() needs for the line from
+    pt1 to pt2. These don't depend on the point, so they can be reused for
+    many points."""
     x1, y1 = pt1
     x2, y2 = pt2
-
-    # ax + by + c = 0 line equation
-    a = y1 - y2
-    b = x2 - x1
-    c = x1 * y2 - x2 * y1
-
-    det = a**2 + b**2
-
     dx = x2 - x1
     dy = y2 - y1
-    if abs(dx) > abs(dy):
-        xp = (b * (b * x - a * y) - a * c) / det
-        t = (xp - x1) / dx
-    else:
-        yp = (a * (-b * x + a * y) - b * c) / det
-        t = (yp - y1) / dy
+    return x1, y1, dx, dy, dx * dx + dy * dy
 
+
+def distancePointToLine(pt, line):
+    x, y = pt
+    x1, y1, dx, dy, lengthSquared = line
+    # Project the point onto the line, and clamp to the line's end points
+    t = ((x - x1) * dx + (y - y1) * dy) / lengthSquared
     if t < 0:
-        return math.hypot(x - x1, y - y1)
+        t = 0
     elif t > 1:
-        return math.hypot(x - x2, y - y2)
-
-    return abs(a * x + b * y + c) / math.sqrt(det)
+        t = 1
+    return math.hypot(x - x1 - t * dx, y - y1 - t * dy)
 
 
 def makeSideGradient(gradientPoints, extrudeSlope):
@@ -394,36 +601,50 @@ def makeSideGradient(gradientPoints, extrudeSlope):
     return buildLinearGradient((0, y0), (0, y1), (x2, y2), colorLine)
 
 
-def makeHighlightGlyphs(font, glyphNames, extrudeAngle, highlightWidth):
-    dx = highlightWidth * math.cos(extrudeAngle) / 2
-    dy = highlightWidth * math.sin(extrudeAngle) / 2
+def getHighlightContours(font, glyphNames):
+    """Return the contours of the highlight layer glyphs, prepared for
+    makeHighlightGlyphs(). These don't depend on the highlight width, so they
+    can be reused for all highlight variants."""
     highlightLayer = font.layers["highlightColor"]
+    highlightContours = {}
     for glyphName in glyphNames:
         if glyphName not in highlightLayer:
             continue
-        highlightLayerGlyphName = glyphName + highlightSuffix
-        highlightGlyph = font.newGlyph(highlightLayerGlyphName)
-        highlightGlyph.width = font[glyphName].width
-        highlightGlyphPen = highlightGlyph.getPen()
         sourceGlyph = highlightLayer[glyphName]
         pbp = PathBuilderPen(highlightLayer)
         sourceGlyph.draw(pbp)
-        highlightPath = pbp.path
-        for contourIndex, contour in enumerate(highlightPath.contours):
+        contours = pbp.path.contours
+        for contour in contours:
             assert contour.segments
             if len(contour.segments) == 1:
                 # Split in two
                 contour.segments = list(contour.segments[0].splitAtT(0.5))
             convertLineToCurve(contour, 0, 0.5, 0.75)
             convertLineToCurve(contour, -1, 0.25, 0.5)
+        highlightContours[glyphName] = contours
+    return highlightContours
+
+
+def makeHighlightGlyphs(font, highlightContours, extrudeAngle, highlightWidth):
+    # Expects highlightContours to be the result of getHighlightContours()
+    dx = highlightWidth * math.cos(extrudeAngle) / 2
+    dy = highlightWidth * math.sin(extrudeAngle) / 2
+    for glyphName, contours in highlightContours.items():
+        highlightLayerGlyphName = glyphName + highlightSuffix
+        highlightGlyph = font.newGlyph(highlightLayerGlyphName)
+        highlightGlyph.width = font[glyphName].width
+        highlightGlyphPen = highlightGlyph.getPen()
+        for contour in contours:
             firstPoint = contour.segments[0].points[0]
             lastPoint = contour.segments[-1].points[-1]
             leftSegments = contour.translate(dx, dy).segments
-            leftSegments[0].points[0] = firstPoint
-            leftSegments[-1].points[-1] = lastPoint
-            rightSegments = contour.translate(-dx, -dy).reverse().segments
-            rightSegments[0].points[0] = lastPoint
-            rightSegments[-1].points[-1] = firstPoint
+            replaceEndPoints(leftSegments, firstPoint, lastPoint)
+            # Same as contour.translate(-dx, -dy).reverse().segments, in one pass
+            rightSegments = [
+                Segment([(x - dx, y - dy) for x, y in reversed(segment.points)])
+                for segment in reversed(contour.segments)
+            ]
+            replaceEndPoints(rightSegments, lastPoint, firstPoint)
             highlightPath = Contour(leftSegments + rightSegments, closed=True)
             highlightPath.draw(highlightGlyphPen)
 
@@ -434,7 +655,12 @@ def convertLineToCurve(contour, segmentIndex, t1, t2):
     pt1, pt4 = contour.segments[segmentIndex].points
     pt2 = interpolatePoints(t1, pt1, pt4)
     pt3 = interpolatePoints(t2, pt1, pt4)
-    contour.segments[segmentIndex].points = [pt1, pt2, pt3, pt4]
+    contour.segments[segmentIndex] = Segment((pt1, pt2, pt3, pt4))
+
+
+def replaceEndPoints(segments, firstPoint, lastPoint):
+    segments[0] = Segment((firstPoint,) + segments[0].points[1:])
+    segments[-1] = Segment(segments[-1].points[:-1] + (lastPoint,))
 
 
 def interpolatePoints(t, pt1, pt2):
@@ -519,49 +745,82 @@ def shearAndExtrude(path):
     highlightAxisFields = getAxisFields(axesByTag["EHLT"])
     defaultFont = None
 
-    for depth, depthName in depthAxisFields:
-        extrudedFont = deepcopy(font)
-        extrudedFont.info.styleName = depthName
-        colorGlyphs = extrudeGlyphs(extrudedFont, glyphNames, extrudeAngle, depth)
+    # The color layers and the front glyphs are only read from after this
+    # point, so the font variants below can all share them.
+    sharedGlyphs = [
+        glyph
+        for layer in font.layers
+        if layer is not font.layers.defaultLayer
+        for glyph in layer
+    ]
+    sharedGlyphs += makeFrontGlyphs(font, glyphNames)
+    allGlyphs = [glyph for layer in font.layers for glyph in layer]
+    glyphsToExtrude = [font[glyphName] for glyphName in glyphNames]
+    splitGlyphData = splitGlyphs(font, glyphNames, extrudeAngle)
+    highlightContours = getHighlightContours(font, glyphNames)
+
+    # Save the font variants in the background while building the next ones
+    saves = []
+    with makeBackgroundExecutor() as saveExecutor:
+        for depth, depthName in depthAxisFields:
+            # extrudeGlyphs() replaces the outlines of these glyphs, so
+            # there is no need to copy them
+            extrudedFont = copyFont(font, sharedGlyphs, glyphsToExtrude)
+            extrudedFont.info.styleName = depthName
+            colorGlyphs = extrudeGlyphs(
+                extrudedFont, glyphNames, splitGlyphData, extrudeAngle, depth
+            )
 
-        if depthName == "Regular":
-            makeHighlightGlyphs(
-                extrudedFont, glyphNames, extrudeAngle, axesByTag["EHLT"].default
+            if depthName == "Regular":
+                makeHighlightGlyphs(
+                    extrudedFont,
+                    highlightContours,
+                    extrudeAngle,
+                    axesByTag["EHLT"].default,
+                )
+                extrudedFont.lib[COLOR_PALETTES_KEY] = palettes
+                extrudedFont.lib[COLOR_LAYERS_KEY] = colorGlyphs
+                extrudedFont.features.text += manualFeatures
+                defaultFont = extrudedFont
+
+            extrudedPath = path.parent / (path.stem + "-" + depthName + path.suffix)
+            saves.append(submitSave(saveExecutor, extrudedFont, extrudedPath))
+            doc.addSourceDescriptor(
+                familyName="Nabla",
+                path=os.fspath(extrudedPath),
+                location={depthAxisName: depth},
             )
-            extrudedFont.lib[COLOR_PALETTES_KEY] = palettes
-            extrudedFont.lib[COLOR_LAYERS_KEY] = colorGlyphs
-            extrudedFont.features.text += manualFeatures
-            defaultFont = extrudedFont
-
-        extrudedPath = path.parent / (path.stem + "-" + depthName + path.suffix)
-        extrudedFont.save(extrudedPath, overwrite=True)
-        doc.addSourceDescriptor(
-            familyName="Nabla",
-            path=os.fspath(extrudedPath),
-            location={depthAxisName: depth},
-        )
 
-    for highlightWidth, highlightName in highlightAxisFields:
-        if highlightName == "Highlight":
-            continue
-        highlightFont = deepcopy(font)
-        highlightFont.info.styleName = highlightName
-        makeHighlightGlyphs(highlightFont, glyphNames, extrudeAngle, highlightWidth)
-        for glyphName in list(highlightFont.keys()):
-            if not glyphName.endswith(highlightSuffix):
-                for layer in highlightFont.layers:
-                    if glyphName in layer:
-                        del layer[glyphName]
-
-        for gn in defaultFont.keys():
-            if gn.startswith(".notdef"):
-                highlightFont[gn] = defaultFont[gn]
-
-        highlightPath = path.parent / (path.stem + "-" + highlightName + path.suffix)
-        highlightFont.save(highlightPath, overwrite=True)
-        doc.addSourceDescriptor(
-            path=os.fspath(highlightPath), location={highlightAxisName: highlightWidth}
-        )
+        for highlightWidth, highlightName in highlightAxisFields:
+            if highlightName == "Highlight":
+                continue
+            # The highlight fonts only add glyphs, and drop all others, so they
+            # can share all existing glyphs
+            highlightFont = copyFont(font, allGlyphs)
+            highlightFont.info.styleName = highlightName
+            makeHighlightGlyphs(
+                highlightFont, highlightContours, extrudeAngle, highlightWidth
+            )
+            for layer in highlightFont.layers:
+                for glyphName in [
+                    gn for gn in layer.keys() if not gn.endswith(highlightSuffix)
+                ]:
+                    del layer[glyphName]
+
+            for gn in defaultFont.keys():
+                if gn.startswith(".notdef"):
+                    highlightFont[gn] = defaultFont[gn]
+
+            highlightPath = path.parent / (
+                path.stem + "-" + highlightName + path.suffix
+            )
+            saves.append(submitSave(saveExecutor, highlightFont, highlightPath))
+            doc.addSourceDescriptor(
+                path=os.fspath(highlightPath),
+                location={highlightAxisName: highlightWidth},
+            )
+    for save in saves:
+        save.result()  # re-raise exceptions, if any
 
     dsPath = path.parent / (path.stem + ".designspace")
     doc.write(dsPath)
@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "scripts"))
+
+from path_tools import PathBuilderPen  # noqa: E402
+
+
+def test_zero_length_contour_is_dropped():
+    pen = PathBuilderPen(None)
+    pen.moveTo((10, 20))
+    pen.lineTo((10, 20))
+    pen.closePath()
+    assert pen.path.contours == []
+
+
+def test_zero_length_lines_are_skipped():
+    pen = PathBuilderPen(None)
+    pen.moveTo((0, 0))
+    pen.lineTo((0.000001, 0))
+    pen.lineTo((100, 0))
+    pen.lineTo((100, 100))
+    pen.lineTo((0.000001, 0.000002))
+    pen.closePath()
+    (contour,) = pen.path.contours
+    assert [segment.points for segment in contour.segments] == [
+        ((0, 0), (100, 0)),
+        ((100, 0), (100, 100)),
+        ((100, 100), (0, 0)),
+    ]